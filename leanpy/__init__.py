@@ -13,9 +13,13 @@ from .deps import LeanDependencyConfig
 from .env import ensure_lake_installed, ensure_lean_installed
 from .project import LeanProject
 from .runner import RunResult
+from .session import LeanSession
 
-__all__ = ["LeanProject", "LeanDependencyConfig", "RunResult"]
-
-# Proactively verify required binaries on import for early feedback.
-ensure_lean_installed()
-ensure_lake_installed()
+__all__ = [
+    "LeanProject",
+    "LeanDependencyConfig",
+    "LeanSession",
+    "RunResult",
+    "ensure_lake_installed",
+    "ensure_lean_installed",
+]
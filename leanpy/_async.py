@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from subprocess import CompletedProcess
+from typing import Any, Coroutine, Optional
+
+
+async def _run_async(
+    args: list[str],
+    cwd: Optional[Path] = None,
+    timeout: Optional[float] = None,
+    *,
+    text: bool = True,
+) -> CompletedProcess[Any]:
+    """
+    Run a command on the event loop and capture output without raising on non-zero exit.
+
+    Mirrors `subprocess.run(..., capture_output=True, text=text)`: the process is
+    killed and `subprocess.TimeoutExpired` raised if it outlives `timeout`, or
+    killed if the awaiting task is cancelled. With `text=False` the output is
+    returned as raw bytes, leaving decoding to the caller.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError as exc:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(args, timeout) from exc
+    except asyncio.CancelledError:
+        # Do not leave the child running when a sibling task fails or the loop shuts down.
+        proc.kill()
+        raise
+    if not text:
+        return CompletedProcess(args, proc.returncode, stdout, stderr)
+    return CompletedProcess(
+        args,
+        proc.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+def _run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Drive `coro` to completion from synchronous code.
+
+    Uses `asyncio.run` directly, or a helper thread when the caller is already
+    inside a running event loop (e.g. Jupyter), where `asyncio.run` is not allowed.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def _gather(*coros: Coroutine[Any, Any, Any]) -> list[Any]:
+    """Run independent coroutines concurrently and return their results in order."""
+
+    async def gather_all() -> list[Any]:
+        return list(await asyncio.gather(*coros))
+
+    return _run_sync(gather_all())
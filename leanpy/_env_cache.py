@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+# Entries older than this are re-probed, so toolchain upgrades are picked up.
+_TTL_SECONDS = 24 * 60 * 60
+
+
+def cache_file() -> Path:
+    """Return the location of the toolchain discovery cache."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "leanpy" / "env.json"
+
+
+def load_env() -> Optional[dict[str, str]]:
+    """
+    Return cached binary paths (`lean`, `lake`) or None.
+
+    The cache is ignored when it is older than 24 hours, was recorded under a
+    different PATH, or points at binaries that no longer exist.
+    """
+    path = cache_file()
+    try:
+        if time.time() - path.stat().st_mtime > _TTL_SECONDS:
+            return None
+        data = json.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("path_hash") != _path_hash():
+        return None
+    for binary in ("lean", "lake"):
+        if binary in data and not os.path.exists(data[binary]):
+            return None
+    return data
+
+
+def update_env(**values: str) -> None:
+    """Merge `values` into the cache for the current PATH (best-effort)."""
+    data = load_env() or {"path_hash": _path_hash()}
+    data.update(values)
+    path = cache_file()
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def clear_env() -> None:
+    """Delete the cache file if present."""
+    try:
+        cache_file().unlink()
+    except OSError:
+        pass
+
+
+def _path_hash() -> str:
+    return hashlib.sha256(os.environ.get("PATH", "").encode("utf-8")).hexdigest()
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
+import functools
+import re
+import shlex
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
 from subprocess import CompletedProcess
-from typing import Any
+from typing import Any, Iterable
 import tomllib
 
 from .errors import DependencyError
 
+# Line shapes understood by _fast_contains_dep; anything else defers to tomllib.
+_ARRAY_TABLE_RE = re.compile(r"^\[\[\s*([A-Za-z0-9_.-]+)\s*\]\]\s*(?:#.*)?$")
+_TABLE_RE = re.compile(r"^\[\s*([A-Za-z0-9_.-]+)\s*\]\s*(?:#.*)?$")
+_STRING_KV_RE = re.compile(r'^([A-Za-z0-9_-]+)\s*=\s*"([^"\\]*)"\s*(?:#.*)?$')
+_SCALAR_KV_RE = re.compile(
+    r'^[A-Za-z0-9_-]+\s*=\s*(?:true|false|[0-9][0-9._:+-]*|\[(?:\s*"[^"\\]*"\s*,?)*\])\s*(?:#.*)?$'
+)
+_TOP_LEVEL_DEP_KEY_RE = re.compile(r"""^["']?(require|dependencies)\b""")
+# Common "https://host/<scope>/<repo>[.git]" and "git@host:<scope>/<repo>[.git]" URLs.
+_GIT_URL_RE = re.compile(r"(?:https?://[^/]+/|git@[^:/]+:)([^/]+)/([^/]+?)(?:\.git)?/?$")
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class LeanDependencyConfig:
     """Configuration for a Lake dependency."""
 
@@ -36,100 +50,328 @@ def install_dependency(project_path: Path, dep: LeanDependencyConfig) -> None:
     then runs `lake update`. If `dep.cache` is True, attempts to prefetch cached
     artifacts via `lake exe cache get` (best-effort).
     """
+    install_dependencies(project_path, [dep])
+
+
+def install_dependencies(
+    project_path: Path,
+    deps: Iterable[LeanDependencyConfig],
+    *,
+    toml_data: dict[str, Any] | None = None,
+) -> None:
+    """
+    Install several dependencies into the project in one pass.
+
+    All missing `[[require]]` entries are appended to lakefile.toml in a single
+    write, followed by one `lake update`. The cache prefetch is per project, so
+    `lake exe cache get` runs at most once, when any dependency asks for it.
+
+    `toml_data` may carry the already-parsed lakefile.toml to avoid re-reading it;
+    it is updated in place with the appended entries.
+
+    When every dependency is already declared and lake-manifest.json is not older
+    than lakefile.toml, nothing is run. The cache prefetch is skipped when
+    `lake update` leaves the manifest untouched.
+    """
+    deps = list(deps)
     lakefile_toml = project_path / "lakefile.toml"
     if not lakefile_toml.exists():
         lakefile_toml.write_text("[package]\n", encoding="utf-8")
+        toml_data = None
 
-    _write_dependency_toml(lakefile_toml, dep)
-
-    def update_with_fallback() -> None:
-        try:
-            _run(["lake", "update", "--reconfigure"], cwd=project_path)
-        except DependencyError as exc:
-            msg = str(exc)
-            if "--reconfigure" in msg or "unknown option" in msg or "unrecognized option" in msg:
-                _run(["lake", "update"], cwd=project_path)
-            else:
-                raise
+    modified = _write_dependencies_toml(lakefile_toml, deps, toml_data)
+    manifest = project_path / "lake-manifest.json"
+    manifest_mtime = _mtime_ns(manifest)
+    if not modified and manifest_mtime is not None and manifest_mtime >= _mtime_ns(lakefile_toml):
+        # Everything was already declared and the manifest reflects it.
+        return
 
-    update_with_fallback()
+    _update(project_path)
 
-    if dep.cache:
+    if any(dep.cache for dep in deps) and _mtime_ns(manifest) != manifest_mtime:
         # Attempt to prefetch cache; ignore failures.
         subprocess.run(
             ["lake", "exe", "cache", "get"],
             cwd=project_path,
-            capture_output=True,
-            text=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
             check=False,
         )
 
 
-def _run(args: list[str], *, cwd: Path) -> CompletedProcess[str]:
-    """Run a command and raise DependencyError on non-zero exit."""
-    proc = subprocess.run(args, cwd=cwd, capture_output=True, text=True)
+def _update(project_path: Path) -> None:
+    """Run `lake update --reconfigure`, retrying without the flag on older Lake."""
+    try:
+        _run(["lake", "update", "--reconfigure"], cwd=project_path)
+    except DependencyError as exc:
+        msg = str(exc)
+        if "--reconfigure" in msg or "unknown option" in msg or "unrecognized option" in msg:
+            _run(["lake", "update"], cwd=project_path)
+        else:
+            raise
+
+
+def _run(args: list[str], *, cwd: Path, quiet: bool = True) -> CompletedProcess[bytes]:
+    """
+    Run a command and raise DependencyError on non-zero exit.
+
+    With `quiet`, stdout is discarded instead of captured (`proc.stdout` is None);
+    stderr is always captured for error reporting. Output stays bytes; it is only
+    decoded for the error message.
+    """
+    proc = subprocess.run(
+        args,
+        cwd=cwd,
+        stdout=subprocess.DEVNULL if quiet else subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
     if proc.returncode != 0:
+        stdout_section = "" if proc.stdout is None else f"stdout:\n{_decode(proc.stdout)}\n\n"
         raise DependencyError(
-            f"Command {' '.join(args)} failed (exit {proc.returncode}).\n"
-            f"stdout:\n{proc.stdout}\n\nstderr:\n{proc.stderr}"
+            f"Command {shlex.join(args)} failed (exit {proc.returncode}).\n"
+            f"{stdout_section}stderr:\n{_decode(proc.stderr)}"
         )
     return proc
 
 
-def _write_dependency_toml(lakefile: Path, dep: LeanDependencyConfig) -> None:
+def _decode(data: bytes) -> str:
+    """Decode captured command output for messages (UTF-8, invalid bytes replaced)."""
+    return data.decode("utf-8", errors="replace")
+
+
+def _write_dependencies_toml(
+    lakefile: Path,
+    deps: list[LeanDependencyConfig],
+    toml_data: dict[str, Any] | None = None,
+) -> bool:
     """
-    Append `[[require]]` dependency entry to lakefile.toml if not already present.
+    Append `[[require]]` entries to lakefile.toml for dependencies not yet present.
 
     Uses tomllib for reliable parsing to detect existing entries instead of
-    relying on string search.
+    relying on string search. The file is parsed and written at most once; the
+    parse is skipped entirely when a quick scan already finds every dependency.
+    When `toml_data` is given it is trusted as the current file contents, the
+    file is only appended to, and the new entries are added to `toml_data`.
+
+    Returns True if the file was modified.
     """
-    text = lakefile.read_text(encoding="utf-8")
-    try:
-        toml_data = tomllib.loads(text) if text.strip() else {}
-    except tomllib.TOMLDecodeError as exc:
-        raise DependencyError(f"Invalid TOML in {lakefile}: {exc}") from exc
+    if toml_data is None:
+        text = lakefile.read_text(encoding="utf-8")
+        if all(_fast_contains_dep(text, dep) is True for dep in deps):
+            return False
+        try:
+            parsed = tomllib.loads(text) if text.strip() else {}
+        except tomllib.TOMLDecodeError as exc:
+            raise DependencyError(f"Invalid TOML in {lakefile}: {exc}") from exc
+    else:
+        parsed = toml_data
 
-    if _dependency_exists(toml_data, dep):
-        return
+    # Compared like _dependency_exists, ignoring fields such as `cache` that are not written.
+    missing: list[LeanDependencyConfig] = []
+    for dep in deps:
+        queued = any(
+            q.scope == dep.scope and q.name == dep.name and dep.version in (None, q.version)
+            for q in missing
+        )
+        if not queued and not _dependency_exists(parsed, dep):
+            missing.append(dep)
+    if not missing:
+        return False
 
     lines = []
-    if text and not text.endswith("\n"):
+    if not _ends_with_newline(lakefile):
         lines.append("")
-    lines.append("[[require]]")
-    lines.append(f'name = "{dep.name}"')
-    lines.append(f'scope = "{dep.scope}"')
-    if dep.version:
-        lines.append(f'rev = "{dep.version}"')
-    lines.append("")  # trailing newline
+    for dep in missing:
+        lines.append("[[require]]")
+        lines.append(f'name = "{dep.name}"')
+        lines.append(f'scope = "{dep.scope}"')
+        if dep.version:
+            lines.append(f'rev = "{dep.version}"')
+        lines.append("")  # trailing newline
+
+    with lakefile.open("a", encoding="utf-8") as f:
+        f.write("\n".join(lines))
 
-    lakefile.write_text(text + "\n".join(lines), encoding="utf-8")
+    if toml_data is not None:
+        require_entries = toml_data.get("require", [])
+        if isinstance(require_entries, dict):
+            require_entries = [require_entries]
+        for dep in missing:
+            entry = {"name": dep.name, "scope": dep.scope}
+            if dep.version:
+                entry["rev"] = dep.version
+            require_entries.append(entry)
+        toml_data["require"] = require_entries
+    return True
+
+
+def _mtime_ns(path: Path) -> int | None:
+    """Return the modification time of `path` in nanoseconds, or None if missing."""
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _ends_with_newline(path: Path) -> bool:
+    """Return True if the file is empty or its last byte is a newline."""
+    with path.open("rb") as f:
+        if f.seek(0, 2) == 0:
+            return True
+        f.seek(-1, 2)
+        return f.read(1) == b"\n"
 
 
 def _dependency_exists(toml_data: dict[str, Any], dep: LeanDependencyConfig) -> bool:
     """Return True if dependency already declared in [[require]] or [dependencies.*]."""
+    return any(
+        declared.scope == dep.scope
+        and declared.name == dep.name
+        and (dep.version is None or dep.version == declared.version)
+        for declared in _declared_dependencies(toml_data)
+    )
+
+
+def _declared_dependencies(toml_data: dict[str, Any]) -> list[LeanDependencyConfig]:
+    """
+    Return dependencies declared in parsed lakefile.toml data.
+
+    Handles both `[[require]]` entries and the older `[dependencies.<name>]` tables;
+    for the latter, a missing scope is inferred from the `git` URL when possible.
+    """
+    deps: list[LeanDependencyConfig] = []
+
     require_entries = toml_data.get("require", [])
     if isinstance(require_entries, dict):
         require_entries = [require_entries]
     for entry in require_entries:
         if not isinstance(entry, dict):
             continue
-        if entry.get("name") == dep.name and entry.get("scope") == dep.scope:
-            version = entry.get("rev") or entry.get("branch") or entry.get("tag")
-            if dep.version is None or dep.version == version:
-                return True
+        name = entry.get("name")
+        if not name:
+            continue
+        scope = entry.get("scope", "unknown")
+        deps.append(LeanDependencyConfig(scope=scope, name=name, version=_entry_version(entry)))
 
     dependencies_table = toml_data.get("dependencies") or {}
     if isinstance(dependencies_table, dict):
-        existing_dep = dependencies_table.get(dep.name)
-        if isinstance(existing_dep, dict):
-            version = (
-                existing_dep.get("rev")
-                or existing_dep.get("branch")
-                or existing_dep.get("tag")
-            )
-            scope = existing_dep.get("scope", "unknown")
-            if scope == dep.scope and (dep.version is None or dep.version == version):
-                return True
-
-    return False
+        for name, cfg in dependencies_table.items():
+            if not isinstance(cfg, dict):
+                continue
+            scope = cfg.get("scope", "unknown")
+            git_url = cfg.get("git")
+            if git_url and scope == "unknown":
+                scope, name_from_git = _scope_name_from_git(git_url, name)
+                name = name_from_git or name
+            deps.append(LeanDependencyConfig(scope=scope, name=name, version=_entry_version(cfg)))
+
+    return deps
+
+
+def _entry_version(entry: dict[str, Any]) -> str | None:
+    """Return the pinned revision of a dependency entry (rev, branch or tag)."""
+    return entry.get("rev") or entry.get("branch") or entry.get("tag")
+
+
+def _scope_name_from_git(git_url: str | None, fallback_name: str) -> tuple[str, str]:
+    """Return (scope, repo) from a git URL, or ("unknown", fallback_name)."""
+    parsed = _parse_git_url(git_url) if git_url else None
+    return parsed or ("unknown", fallback_name)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_git_url(url: str) -> tuple[str, str] | None:
+    """Return (scope, repo) from the last two path segments of a git URL, if present."""
+    match = _GIT_URL_RE.match(url)
+    if match:
+        return match.group(1), match.group(2)
+    # Keep only the repository path: drop "scheme://host/" or scp-style "user@host:".
+    _, sep, rest = url.partition("://")
+    path = rest.partition("/")[2] if sep else url.rpartition(":")[2]
+    parts = path.strip("/").rsplit("/", 2)
+    if len(parts) >= 2 and parts[-2] and parts[-1]:
+        return parts[-2], parts[-1].removesuffix(".git")
+    return None
+
+
+def _fast_contains_dep(text: str, dep: LeanDependencyConfig) -> bool | None:
+    """
+    Scan lakefile.toml text for `dep` without a full TOML parse.
+
+    Recognizes `[[require]]` blocks and `[dependencies.<name>]` tables made of plain
+    `key = "value"` lines, matching with the same rules as `_declared_dependencies`.
+    Returns None when the file uses a shape the scan does not understand (inline
+    tables, dotted keys, multi-line strings, ...) or looks invalid (a key repeated
+    within a table, a `[table]` header repeated), in which case callers must parse.
+    """
+    block: str | None = None  # "require", "dependency" or "other" once a header is seen
+    table_name = ""
+    entry: dict[str, str] = {}
+    keys: set[str] = set()  # keys assigned in the current table
+    tables: set[str] = set()  # `[table]` headers seen so far
+    found = False  # only reported once the whole file was checked for repeats
+
+    def entry_matches() -> bool:
+        if block == "require":
+            name, scope = entry.get("name"), entry.get("scope", "unknown")
+        elif block == "dependency":
+            name, scope = table_name, entry.get("scope", "unknown")
+            if entry.get("git") and scope == "unknown":
+                scope, name = _scope_name_from_git(entry["git"], name)
+        else:
+            return False
+        if name != dep.name or scope != dep.scope:
+            return False
+        version = _entry_version(entry)
+        return dep.version is None or dep.version == version
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if '"""' in line or "'''" in line:
+            return None
+
+        if line.startswith("["):
+            found = found or entry_matches()
+            entry = {}
+            keys = set()
+            match = _ARRAY_TABLE_RE.match(line)
+            if match:
+                key = match.group(1)
+                if key == "require":
+                    block = "require"
+                    continue
+                if key.split(".")[0] in ("require", "dependencies"):
+                    return None
+                block = "other"
+                continue
+            match = _TABLE_RE.match(line)
+            if not match or match.group(1) in tables:
+                return None
+            tables.add(match.group(1))
+            parts = match.group(1).split(".")
+            if parts[0] == "require" or (parts[0] == "dependencies" and len(parts) != 2):
+                return None
+            if parts[0] == "dependencies":
+                block, table_name = "dependency", parts[1]
+            else:
+                block = "other"
+            continue
+
+        if "=" in line:
+            # Rough key extraction; a false repeat only costs a full parse.
+            key = line.partition("=")[0].strip().strip("\"'")
+            if key in keys:
+                return None
+            keys.add(key)
+        if block in ("require", "dependency"):
+            match = _STRING_KV_RE.match(line)
+            if match:
+                entry[match.group(1)] = match.group(2)
+            elif not _SCALAR_KV_RE.match(line):
+                return None
+        elif block is None and _TOP_LEVEL_DEP_KEY_RE.match(line):
+            return None
 
+    return found or entry_matches()
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import functools
 import shutil
 import subprocess
 from subprocess import CompletedProcess
 from typing import Optional
 
+from ._async import _gather, _run_async
+from ._env_cache import clear_env, load_env, update_env
 from .errors import LakeNotFound, LeanNotFound, LeanPyError
 
 
@@ -22,9 +25,21 @@ def _run_command(args: list[str], *, timeout: Optional[int] = 10) -> CompletedPr
         raise LeanPyError(f"Command not found: {args[0]}") from exc
 
 
+def _which(name: str) -> Optional[str]:
+    """Look up `name` on PATH, consulting the on-disk discovery cache first."""
+    cached = (load_env() or {}).get(name)
+    if cached:
+        return cached
+    path = shutil.which(name)
+    if path:
+        update_env(**{name: path})
+    return path
+
+
+@functools.lru_cache(maxsize=None)
 def ensure_lean_installed() -> str:
     """Return the `lean` path or raise LeanNotFound if missing."""
-    path = shutil.which("lean")
+    path = _which("lean")
     if not path:
         raise LeanNotFound(
             "lean binary not found on PATH. Install Lean or activate your toolchain."
@@ -32,9 +47,10 @@ def ensure_lean_installed() -> str:
     return path
 
 
+@functools.lru_cache(maxsize=None)
 def ensure_lake_installed() -> str:
     """Return the `lake` path or raise LakeNotFound if missing."""
-    path = shutil.which("lake")
+    path = _which("lake")
     if not path:
         raise LakeNotFound(
             "lake binary not found on PATH. Install Lake (Lean 4) or activate your toolchain."
@@ -44,14 +60,64 @@ def ensure_lake_installed() -> str:
 
 def lean_version() -> str:
     """Return the detected Lean version string."""
-    ensure_lean_installed()
-    proc = _run_command(["lean", "--version"])
-    return proc.stdout.strip() or proc.stderr.strip()
+    return _probe_versions_once()[0]
 
 
 def lake_version() -> str:
     """Return the detected Lake version string."""
+    return _probe_versions_once()[1]
+
+
+def versions() -> dict[str, str]:
+    """Return detected Lean and Lake version strings."""
+    lean, lake = _probe_versions_once()
+    return {"lean": lean, "lake": lake}
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_versions_once() -> tuple[str, str]:
+    """
+    Return (lean, lake) version strings, raising LeanNotFound/LakeNotFound if missing.
+
+    Both `--version` subprocesses run concurrently, memoized per process only: with
+    elan, `lean` and `lake` are shims whose version depends on the project's
+    `lean-toolchain`, so the strings are not persisted across processes. A probe
+    that times out or exits non-zero raises LeanPyError and is not remembered.
+    """
+    ensure_lean_installed()
     ensure_lake_installed()
-    proc = _run_command(["lake", "--version"])
-    return proc.stdout.strip() or proc.stderr.strip()
 
+    try:
+        lean, lake = _gather(
+            _run_async(["lean", "--version"], timeout=10),
+            _run_async(["lake", "--version"], timeout=10),
+        )
+    except FileNotFoundError as exc:
+        raise LeanPyError(f"Command not found: {exc.filename}") from exc
+    except subprocess.TimeoutExpired as exc:
+        raise LeanPyError(f"Version probe timed out after {exc.timeout}s") from exc
+    lean_v = _checked_version("lean", lean.stdout or lean.stderr, lean.returncode)
+    lake_v = _checked_version("lake", lake.stdout or lake.stderr, lake.returncode)
+    return lean_v, lake_v
+
+
+def _checked_version(name: str, output: str, returncode: int) -> str:
+    """Return the stripped `<name> --version` output, or raise LeanPyError if it failed."""
+    if returncode != 0:
+        raise LeanPyError(f"{name} --version failed (exit {returncode}):\n{output.strip()}")
+    return output.strip()
+
+
+def invalidate_cache() -> None:
+    """
+    Forget memoized binary lookups and version strings (e.g. after changing PATH).
+
+    Clears both the in-process memoization and the on-disk cache shared across processes.
+    """
+    clear_env()
+    for fn in (
+        ensure_lean_installed,
+        ensure_lake_installed,
+        _probe_versions_once,
+    ):
+        fn.cache_clear()
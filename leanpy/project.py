@@ -1,22 +1,51 @@
 from __future__ import annotations
 
+import ctypes
+import functools
 import json
 import os
+import shlex
 import shutil
+import stat
 import subprocess
+import sys
+import threading
+import time
 import tomllib
+import weakref
 from pathlib import Path
 from subprocess import CompletedProcess
-from typing import Any, List, Optional, Tuple
-from urllib.parse import urlparse
-
-from .deps import LeanDependencyConfig, install_dependency
-from .env import ensure_lake_installed, ensure_lean_installed, lake_version, lean_version
-from .errors import ProjectInitError
-from .runner import RunResult, run_code
-
-# Command, stdout, stderr, returncode
-RunLogEntry = Tuple[list[str], str, str, int]
+from typing import Any, Collection, Iterable, List, Optional, Tuple
+
+from .deps import (
+    LeanDependencyConfig,
+    _declared_dependencies,
+    _decode,
+    _mtime_ns,
+    _scope_name_from_git,
+    install_dependencies,
+)
+from .env import ensure_lake_installed, ensure_lean_installed, versions
+from .errors import DependencyError, ProjectInitError
+from .runner import RunResult, _run_code_resolved, _run_many_resolved
+from .session import LeanSession
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+_LAKEFILE_NAMES = frozenset({"lakefile.lean", "lakefile.toml"})
+_DEPENDENCY_FILES = ("lake-manifest.json", "lakefile.toml")
+# Seconds the best-effort `lake env` warm-up after project creation may take.
+_WARM_UP_TIMEOUT = 60
+# Linux ioctl that makes `dst` share `src`'s extents (Btrfs, XFS, bcachefs, ...).
+_FICLONE = 0x40049409
 
 
 class LeanProject:
@@ -28,200 +57,444 @@ class LeanProject:
     - If the directory exists and is empty, run `lake init` inside it.
     - If the directory exists and contains Lake files, reuse it.
     - If the directory exists and is non-empty without Lake files, raise ProjectInitError.
+
+    Constructing a LeanProject for a path that already has a live instance returns
+    that instance without re-probing, unless the directory is no longer a Lake
+    project or a different `name` is requested. Its dependencies are reloaded if
+    lake-manifest.json or lakefile.toml changed since they were loaded.
     """
 
+    # Live instances by path, so repeated construction skips the init work.
+    _instances: "weakref.WeakValueDictionary[Path, LeanProject]" = weakref.WeakValueDictionary()
+
+    def __new__(
+        cls, project_path: Optional[os.PathLike | str] = None, name: Optional[str] = None
+    ) -> "LeanProject":
+        # copy and pickle call __new__ without arguments and restore the state themselves.
+        if project_path is None:
+            return super().__new__(cls)
+        path = _resolve_path(project_path)
+        instance = cls._instances.get(path)
+        if (
+            type(instance) is cls
+            and (name is None or name == instance.name)
+            and instance._is_lake_project()
+        ):
+            return instance
+        instance = super().__new__(cls)
+        instance.path = path
+        return instance
+
     def __init__(self, project_path: os.PathLike | str, name: Optional[str] = None):
-        self.path = Path(project_path).expanduser().resolve()
+        if self.__dict__.get("_initialized"):
+            stamp = self._dependency_stamp()
+            if stamp != self._loaded_stamp:
+                self._load_existing_dependencies(
+                    [name for name, mtime in zip(_DEPENDENCY_FILES, stamp) if mtime is not None]
+                )
+            return
+        if "path" not in self.__dict__:
+            self.path = _resolve_path(project_path)
+        self.lakefile = self.path / "lakefile.lean"
         ensure_lean_installed()
         ensure_lake_installed()
         self.name = name or self.path.name
-        self.dependencies: set[LeanDependencyConfig] = set()
-        self._init_or_reuse()
-        self._load_existing_dependencies()
-
-    @property
-    def lakefile(self) -> Path:
-        return self.path / "lakefile.lean"
+        # Keyed by (scope, name); a later declaration of the same package replaces the earlier one.
+        self.dependencies: dict[tuple[str, str], LeanDependencyConfig] = {}
+        # (st_mtime_ns, parsed lakefile.toml) of the last read, to skip re-parsing.
+        self._toml_cache: Optional[tuple[int, dict[str, Any]]] = None
+        # Background deletion started by remove(), if any.
+        self._remove_thread: Optional[threading.Thread] = None
+        self._load_existing_dependencies(self._init_or_reuse())
+        self._initialized = True
+        LeanProject._instances[self.path] = self
+
+    def __getstate__(self) -> dict[str, Any]:
+        # A running deletion thread cannot be copied or pickled; it belongs to this instance.
+        state = self.__dict__.copy()
+        state["_remove_thread"] = None
+        return state
 
     def install_dependency(self, dep: LeanDependencyConfig) -> None:
         """Install a dependency via Lake and record it locally."""
-        install_dependency(self.path, dep)
-        self.dependencies.add(dep)
+        self.install_dependencies([dep])
 
-    def run(self, *, imports: List[str], code: str, timeout: int = 30) -> RunResult:
-        """Run Lean code with optional imports inside this project."""
-        return run_code(self.path, imports=imports, code=code, timeout=timeout)
+    def install_dependencies(self, deps: Iterable[LeanDependencyConfig]) -> None:
+        """Install several dependencies with a single `lake update` and record them locally."""
+        deps = list(deps)
+        lakefile_toml = self.path / "lakefile.toml"
+        try:
+            toml_data = self._read_lakefile_toml()
+        except tomllib.TOMLDecodeError as exc:
+            raise DependencyError(f"Invalid TOML in {lakefile_toml}: {exc}") from exc
+        install_dependencies(self.path, deps, toml_data=toml_data)
+        if toml_data is not None:
+            # The appended entries were merged into toml_data; just record the new mtime.
+            self._toml_cache = (lakefile_toml.stat().st_mtime_ns, toml_data)
+        for dep in deps:
+            self.dependencies[(dep.scope, dep.name)] = dep
+
+    def run(
+        self, *, imports: List[str], code: str, timeout: int = 30, cache: bool = False
+    ) -> RunResult:
+        """Run Lean code with optional imports inside this project (see `run_code`)."""
+        return _run_code_resolved(
+            self.path, imports=imports, code=code, timeout=timeout, cache=cache
+        )
+
+    def run_many(
+        self,
+        jobs: Iterable[Tuple[List[str], str]],
+        *,
+        max_parallel: Optional[int] = None,
+        timeout: int = 30,
+        cache: bool = False,
+    ) -> List[RunResult]:
+        """Run several `(imports, code)` snippets concurrently (see `runner.run_many`)."""
+        return _run_many_resolved(
+            self.path, jobs, max_parallel=max_parallel, timeout=timeout, cache=cache
+        )
+
+    def session(self, *, max_documents: int = 4) -> LeanSession:
+        """Return a LeanSession that checks snippets on one long-lived `lake serve`."""
+        return LeanSession(self.path, max_documents=max_documents)
 
     def versions(self) -> dict[str, str]:
         """Return detected Lean and Lake versions."""
-        return {"lean": lean_version(), "lake": lake_version()}
+        return versions()
 
     def remove(self) -> None:
-        """Delete the project directory recursively (best-effort)."""
-        shutil.rmtree(self.path, ignore_errors=True)
+        """
+        Delete the project directory recursively (best-effort).
+
+        The directory is first renamed to a hidden sibling, so `self.path` is free
+        as soon as this returns, and then deleted by a background thread (kept as
+        `_remove_thread` so callers can join it). If the rename fails, it is deleted
+        inline instead.
+        """
+        if LeanProject._instances.get(self.path) is self:
+            del LeanProject._instances[self.path]
+        trash = self.path.with_name(
+            f".{self.path.name}.leanpy-trash-{os.getpid()}-{time.time_ns()}"
+        )
+        try:
+            os.rename(self.path, trash)
+        except FileNotFoundError:
+            return
+        except OSError:
+            shutil.rmtree(self.path, ignore_errors=True)
+            return
+        # Not a daemon thread: interpreter exit waits for it instead of leaking the trash.
+        self._remove_thread = threading.Thread(
+            target=shutil.rmtree, args=(trash,), kwargs={"ignore_errors": True}
+        )
+        self._remove_thread.start()
 
     def clone(self, new_dir: os.PathLike | str, new_name: Optional[str] = None) -> "LeanProject":
         """
         Copy the current project to `new_dir` and initialize a LeanProject there.
 
-        Files are copied as-is; `new_name` overrides the inferred project name.
+        Files are copied as-is, as copy-on-write clones where the filesystem supports
+        it, so `.lake` build caches come along almost for free. Only the `.leanpy`
+        run scratch directory is left behind. `new_name` overrides the inferred
+        project name.
         """
-        dest = Path(new_dir).expanduser().resolve()
+        dest = _resolve_path(new_dir)
         if dest.exists():
             raise ProjectInitError(f"Destination {dest} already exists; cannot clone.")
+        root = str(self.path)
+
+        def ignore_scratch(directory: str, names: list[str]) -> list[str]:
+            return [".leanpy"] if directory == root and ".leanpy" in names else []
+
         try:
-            shutil.copytree(self.path, dest)
+            shutil.copytree(self.path, dest, ignore=ignore_scratch, copy_function=_reflink_copy)
         except Exception as exc:
             raise ProjectInitError(f"Failed to clone project to {dest}: {exc}") from exc
         return LeanProject(dest, name=new_name or dest.name)
 
     # --- internal helpers ---
-    def _init_or_reuse(self) -> None:
-        """Initialize project if needed or verify an existing Lake project."""
-        run_log: list[RunLogEntry] = []
-        if self.path.exists():
-            if self._is_lake_project():
-                return
-            if any(self.path.iterdir()):
+    def _init_or_reuse(self) -> frozenset[str]:
+        """
+        Initialize project if needed or verify an existing Lake project.
+
+        Returns the dependency files (lake-manifest.json, lakefile.toml) present afterwards.
+        """
+        try:
+            has_lake, non_empty, dependency_files = self._probe_dir()
+        except FileNotFoundError:
+            proc = self._create_from_parent()
+        else:
+            if has_lake:
+                return dependency_files
+            if non_empty:
                 raise ProjectInitError(
                     f"Directory {self.path} exists but is not a Lake project and not empty."
                 )
-            run_log.append(self._init_empty_dir())
-        else:
-            run_log.append(self._create_from_parent())
+            proc = self._init_empty_dir()
 
-        if not self._is_lake_project():
+        try:
+            has_lake, _, dependency_files = self._probe_dir()
+        except FileNotFoundError:
+            has_lake = False
+        if not has_lake:
             contents_str = self._describe_dir_contents()
-            cmd_section = self._format_run_log(run_log)
+            cmd_section = self._format_run_log([proc])
             raise ProjectInitError(
                 f"Expected Lake files not found in {self.path}. Initialization may have failed. "
                 f"Directory contents: {contents_str}.{cmd_section}"
             )
+        self._warm_up()
+        return dependency_files
 
     def _is_lake_project(self) -> bool:
         """Return True if recognizable Lake project files exist."""
-        return self.lakefile.exists() or (self.path / "lakefile.toml").exists()
+        try:
+            return self._probe_dir()[0]
+        except FileNotFoundError:
+            return False
+
+    def _probe_dir(self) -> tuple[bool, bool, frozenset[str]]:
+        """
+        Return (has_lakefile, non_empty, dependency_files) in one scandir pass.
+
+        `dependency_files` holds whichever of lake-manifest.json and lakefile.toml
+        exist. Raises FileNotFoundError if the directory does not exist.
+        """
+        has_lakefile = non_empty = False
+        dependency_files = []
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                non_empty = True
+                if entry.name in _LAKEFILE_NAMES:
+                    has_lakefile = True
+                if entry.name in _DEPENDENCY_FILES:
+                    dependency_files.append(entry.name)
+        return has_lakefile, non_empty, frozenset(dependency_files)
+
+    def _run(self, args: list[str], *, cwd: Path, quiet: bool = True) -> CompletedProcess[bytes]:
+        """
+        Run a command, raising ProjectInitError on failure.
 
-    def _run(self, args: list[str], *, cwd: Path) -> CompletedProcess[str]:
-        """Run a command, raising ProjectInitError on failure."""
-        proc = subprocess.run(args, cwd=cwd, capture_output=True, text=True)
+        With `quiet`, stdout is discarded instead of captured (`proc.stdout` is None);
+        stderr is always captured for error reporting.
+        """
+        proc = subprocess.run(
+            args,
+            cwd=cwd,
+            stdout=subprocess.DEVNULL if quiet else subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
         if proc.returncode != 0:
+            stdout_section = "" if proc.stdout is None else f"stdout:\n{_decode(proc.stdout)}\n\n"
             raise ProjectInitError(
-                f"Command {' '.join(args)} failed (exit {proc.returncode}).\n"
-                f"stdout:\n{proc.stdout}\n\nstderr:\n{proc.stderr}"
+                f"Command {shlex.join(args)} failed (exit {proc.returncode}).\n"
+                f"{stdout_section}stderr:\n{_decode(proc.stderr)}"
             )
         return proc
 
-    def _init_empty_dir(self) -> RunLogEntry:
+    def _init_empty_dir(self) -> CompletedProcess[bytes]:
         """Initialize an empty directory with `lake init`."""
-        proc = self._run(["lake", "init"], cwd=self.path)
-        return (["lake", "init"], proc.stdout, proc.stderr, proc.returncode)
+        return self._run(["lake", "init"], cwd=self.path)
 
-    def _create_from_parent(self) -> RunLogEntry:
+    def _create_from_parent(self) -> CompletedProcess[bytes]:
         """Create project directory parents and run `lake new <name>` in the parent."""
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        proc = self._run(["lake", "new", self.name], cwd=self.path.parent)
-        return (["lake", "new", self.name], proc.stdout, proc.stderr, proc.returncode)
+        return self._run(["lake", "new", self.name], cwd=self.path.parent)
+
+    def _warm_up(self) -> None:
+        """
+        Let Lake configure the new workspace now rather than on the first run (best-effort).
+
+        `lake env` elaborates the lakefile and caches the result under `.lake`, which
+        would otherwise be paid by the first `run` call. Failures, and warm-ups
+        outliving `_WARM_UP_TIMEOUT` seconds (e.g. a toolchain download), are
+        ignored; the first run deals with them instead.
+        """
+        try:
+            subprocess.run(
+                ["lake", "env", "lean", "--version"],
+                cwd=self.path,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=_WARM_UP_TIMEOUT,
+                check=False,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            pass
 
     def _describe_dir_contents(self) -> str:
         """Return a human-friendly description of directory contents."""
         try:
-            contents = sorted(p.name for p in self.path.iterdir())
+            with os.scandir(self.path) as entries:
+                contents = sorted(entry.name for entry in entries)
             return ", ".join(contents) if contents else "(empty)"
         except Exception:
             return "(unreadable)"
 
-    def _format_run_log(self, run_log: list[RunLogEntry]) -> str:
-        """Format run log for error messages."""
+    def _format_run_log(self, run_log: list[CompletedProcess[bytes]]) -> str:
+        """Format the commands run during initialization for error messages."""
         if not run_log:
             return ""
         cmd_lines = []
-        for args, stdout, stderr, rc in run_log:
-            cmd_lines.append(f"{' '.join(args)} (exit {rc})\nstdout:\n{stdout}\nstderr:\n{stderr}")
+        for proc in run_log:
+            cmd_lines.append(
+                f"{shlex.join(proc.args)} (exit {proc.returncode})\n"
+                f"stdout:\n{_decode(proc.stdout or b'')}\nstderr:\n{_decode(proc.stderr)}"
+            )
         return "\nCommands run:\n" + "\n---\n".join(cmd_lines)
 
-    def _load_existing_dependencies(self) -> None:
-        """Populate dependencies from lake-manifest.json or lakefile.toml if present."""
+    def _dependency_stamp(
+        self, present: Collection[str] = _DEPENDENCY_FILES
+    ) -> tuple[int | None, ...]:
+        """Return the mtimes of the dependency files (None if missing or not in `present`)."""
+        return tuple(
+            _mtime_ns(self.path / name) if name in present else None for name in _DEPENDENCY_FILES
+        )
+
+    def _load_existing_dependencies(self, present: Collection[str]) -> None:
+        """
+        Replace dependencies with those declared in `present` (lake-manifest.json, lakefile.toml).
+
+        Both files are parsed before anything is replaced, so a parse error leaves the
+        previous dependencies and load stamp in place and is raised again next time.
+        """
+        stamp = self._dependency_stamp(present)
+        dependencies: dict[tuple[str, str], LeanDependencyConfig] = {}
         manifest = self.path / "lake-manifest.json"
-        if manifest.exists():
+        if "lake-manifest.json" in present:
             try:
-                data = json.loads(manifest.read_text(encoding="utf-8"))
+                data = _fast_json_loads(_read_bytes_fast(manifest))
                 packages = data.get("packages", [])
                 for pkg in packages:
                     pkg_name = pkg.get("name")
                     if not pkg_name or pkg_name == self.name:
                         continue
                     scope, name = self._extract_scope_and_name(pkg)
-                    dep = LeanDependencyConfig(scope=scope, name=name)
-                    self.dependencies.add(dep)
+                    dependencies[(scope, name)] = LeanDependencyConfig(scope=scope, name=name)
             except Exception as exc:
                 raise ProjectInitError(
                     f"Failed to load dependencies from {manifest}: {exc}"
                 ) from exc
 
+        if "lakefile.toml" in present:
+            for dep in self._extract_from_toml():
+                dependencies[(dep.scope, dep.name)] = dep
+
+        self.dependencies.clear()
+        self.dependencies.update(dependencies)
+        self._loaded_stamp = stamp
+
+    def _read_lakefile_toml(self) -> Optional[dict[str, Any]]:
+        """
+        Return parsed lakefile.toml (None if absent), re-parsing only when its mtime changes.
+
+        Raises tomllib.TOMLDecodeError; callers wrap it in their own error type.
+        """
         lakefile_toml = self.path / "lakefile.toml"
-        if lakefile_toml.exists():
-            for dep in self._extract_from_toml(lakefile_toml):
-                self.dependencies.add(dep)
+        try:
+            mtime = lakefile_toml.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._toml_cache = None
+            return None
+        if self._toml_cache is not None and self._toml_cache[0] == mtime:
+            return self._toml_cache[1]
+        with lakefile_toml.open("rb") as fp:
+            toml_data: dict[str, Any] = tomllib.load(fp)
+        self._toml_cache = (mtime, toml_data)
+        return toml_data
 
     def _extract_scope_and_name(self, pkg: dict) -> tuple[str, str]:
         """Best-effort extraction of scope/name from manifest package entry."""
         url = pkg.get("url") or pkg.get("git") or pkg.get("gitUrl") or ""
-        parsed = urlparse(url)
-        path_parts = [p for p in parsed.path.split("/") if p]
-        if len(path_parts) >= 2:
-            scope = path_parts[-2]
-            repo = path_parts[-1].removesuffix(".git")
-            return scope, repo
         # Fallback: unknown scope, keep manifest name as repo.
-        name = pkg.get("name", "unknown")
-        return "unknown", name
+        return _scope_name_from_git(url, pkg.get("name", "unknown"))
 
-    def _extract_from_toml(self, lakefile: Path) -> list[LeanDependencyConfig]:
+    def _extract_from_toml(self) -> list[LeanDependencyConfig]:
         """Parse lakefile.toml dependencies (old [dependencies.*] and [[require]])."""
         try:
-            toml_data: dict[str, Any] = tomllib.loads(lakefile.read_text(encoding="utf-8"))
+            toml_data = self._read_lakefile_toml()
         except tomllib.TOMLDecodeError as exc:
-            raise ProjectInitError(f"Invalid TOML in {lakefile}: {exc}") from exc
-
-        deps: list[LeanDependencyConfig] = []
-
-        require_entries = toml_data.get("require", [])
-        if isinstance(require_entries, dict):
-            require_entries = [require_entries]
-        for entry in require_entries:
-            if not isinstance(entry, dict):
-                continue
-            name = entry.get("name")
-            if not name:
-                continue
-            scope = entry.get("scope", "unknown")
-            version = entry.get("rev") or entry.get("branch") or entry.get("tag")
-            deps.append(LeanDependencyConfig(scope=scope, name=name, version=version))
-
-        dependencies_table = toml_data.get("dependencies") or {}
-        if isinstance(dependencies_table, dict):
-            for name, cfg in dependencies_table.items():
-                if not isinstance(cfg, dict):
-                    continue
-                scope = cfg.get("scope", "unknown")
-                version = cfg.get("rev") or cfg.get("branch") or cfg.get("tag")
-                git_url = cfg.get("git")
-                if git_url and scope == "unknown":
-                    scope, name_from_git = self._scope_name_from_git(git_url, name)
-                    name = name_from_git or name
-                deps.append(LeanDependencyConfig(scope=scope, name=name, version=version))
-
-        return deps
-
-    def _scope_name_from_git(self, git_url: str | None, fallback_name: str) -> tuple[str, str]:
-        if git_url:
-            parsed = urlparse(git_url)
-            parts = [p for p in parsed.path.split("/") if p]
-            if len(parts) >= 2:
-                scope = parts[-2]
-                repo = parts[-1].removesuffix(".git")
-                return scope, repo
-        return "unknown", fallback_name
+            raise ProjectInitError(f"Invalid TOML in {self.path / 'lakefile.toml'}: {exc}") from exc
+        if toml_data is None:
+            return []
+        return _declared_dependencies(toml_data)
+
 
+def _resolve_path(path: os.PathLike | str) -> Path:
+    """
+    Return the absolute, symlink-free Path for `path` (with `~` expanded).
 
+    Symlinks are always resolved so that every spelling of a project directory maps
+    to one instance-cache entry, and `remove()` deletes the real directory.
+    """
+    return Path(os.path.realpath(os.path.expanduser(path)))
+
+
+def _reflink_copy(src: str, dst: str) -> str:
+    """
+    Copy `src` to `dst` as a copy-on-write clone when possible, else via `shutil.copy2`.
+
+    Used as the `copy_function` of `shutil.copytree`; metadata is preserved either way.
+    Only regular files are cloned: opening e.g. a named pipe would block.
+    """
+    try:
+        regular = stat.S_ISREG(os.stat(src).st_mode)
+    except OSError:
+        regular = False
+    if regular and _clone_file(src, dst):
+        shutil.copystat(src, dst)
+        return dst
+    return shutil.copy2(src, dst)
+
+
+def _clone_file(src: str, dst: str) -> bool:
+    """Try to clone `src` to the new file `dst` (clonefile/FICLONE); return success."""
+    clonefile = _macos_clonefile()
+    if clonefile is not None:
+        return clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+    except OSError:
+        # Not a CoW filesystem, or src/dst on different filesystems; copy2 overwrites dst.
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def _macos_clonefile() -> Any:
+    """Return libc `clonefile(2)` on macOS (APFS clones), else None."""
+    if sys.platform != "darwin":
+        return None
+    clonefile = getattr(ctypes.CDLL(None, use_errno=True), "clonefile", None)
+    if clonefile is not None:
+        clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint32]
+        clonefile.restype = ctypes.c_int
+    return clonefile
+
+
+def _read_bytes_fast(path: Path) -> bytes:
+    """Read a whole file with raw `os.read` calls sized by `fstat` (no buffered file object)."""
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        remaining = os.fstat(fd).st_size
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(remaining, 64 * 1024))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+def _fast_json_loads(data: bytes) -> Any:
+    """Parse JSON bytes with orjson when installed, else the stdlib json module."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
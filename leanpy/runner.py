@@ -1,62 +1,234 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import hashlib
+import json
+import os
 import subprocess
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Optional, Tuple
 
+from ._async import _run_async, _run_sync
 from .errors import ExecutionError
 
+try:
+    import blake3
+except ImportError:  # pragma: no cover - optional speedup
+    blake3 = None
+
+# Project files whose changes invalidate cached run results.
+_PROJECT_CONFIG_FILES = ("lakefile.lean", "lakefile.toml", "lake-manifest.json", "lean-toolchain")
+
 
 @dataclass(frozen=True)
 class RunResult:
-    """Result of executing a Lean snippet."""
+    """
+    Result of executing a Lean snippet.
+
+    Output is kept as the raw bytes Lean wrote; `stdout` and `stderr` decode it
+    (UTF-8, invalid bytes replaced) on first access.
+    """
 
     file: str
-    stdout: str
-    stderr: str
+    stdout_bytes: bytes
+    stderr_bytes: bytes
     returncode: int
 
+    @cached_property
+    def stdout(self) -> str:
+        return self.stdout_bytes.decode("utf-8", errors="replace")
+
+    @cached_property
+    def stderr(self) -> str:
+        return self.stderr_bytes.decode("utf-8", errors="replace")
+
 
-def run_code(project_path: Path, *, imports: List[str], code: str, timeout: int = 30) -> RunResult:
+def run_code(
+    project_path: Path,
+    *,
+    imports: List[str],
+    code: str,
+    timeout: int = 30,
+    cache: bool = False,
+) -> RunResult:
     """
     Run a Lean snippet inside the given project.
 
     Writes a temp file under `.leanpy/run_<hash>.lean` that contains the provided
     imports followed by the code, then executes `lake env lean <file>`.
 
+    With `cache=True` (opt-in), a successful result is stored next to the file as
+    `run_<hash>.result.json` and returned directly by later identical runs, as long
+    as the run file and the project configuration (lakefile, lake-manifest.json,
+    lean-toolchain) are unchanged. Build outputs are not tracked, so only enable it
+    for snippets whose output is deterministic and that do not import modules of
+    the project itself that may be rebuilt.
+
     Returns RunResult; raises ExecutionError on non-zero exit or timeout.
     """
     project_path = project_path.expanduser().resolve()
+    return _run_code_resolved(
+        project_path, imports=imports, code=code, timeout=timeout, cache=cache
+    )
+
+
+def _run_code_resolved(
+    project_path: Path, *, imports: List[str], code: str, timeout: int, cache: bool
+) -> RunResult:
+    """`run_code` for an already resolved `project_path` (e.g. `LeanProject.path`)."""
+    return _run_sync(
+        _run_code_async(project_path, imports=imports, code=code, timeout=timeout, cache=cache)
+    )
+
+
+def run_many(
+    project_path: Path,
+    jobs: Iterable[Tuple[List[str], str]],
+    *,
+    max_parallel: Optional[int] = None,
+    timeout: int = 30,
+    cache: bool = False,
+) -> List[RunResult]:
+    """
+    Run several `(imports, code)` snippets concurrently inside the given project.
+
+    Each job behaves like `run_code`; at most `max_parallel` Lean processes
+    (default: CPU count) run at a time. Results are returned in job order. Every
+    job runs to completion; if any failed, the first failure in job order is raised.
+    """
+    project_path = project_path.expanduser().resolve()
+    return _run_many_resolved(
+        project_path, jobs, max_parallel=max_parallel, timeout=timeout, cache=cache
+    )
+
+
+def _run_many_resolved(
+    project_path: Path,
+    jobs: Iterable[Tuple[List[str], str]],
+    *,
+    max_parallel: Optional[int],
+    timeout: int,
+    cache: bool,
+) -> List[RunResult]:
+    """`run_many` for an already resolved `project_path` (e.g. `LeanProject.path`)."""
+    limit = max_parallel or os.cpu_count() or 1
+
+    async def run_all() -> List[RunResult]:
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run_one(imports: List[str], code: str) -> RunResult:
+            async with semaphore:
+                return await _run_code_async(
+                    project_path, imports=imports, code=code, timeout=timeout, cache=cache
+                )
+
+        return list(
+            await asyncio.gather(
+                *(run_one(imports, code) for imports, code in jobs), return_exceptions=True
+            )
+        )
+
+    results = _run_sync(run_all())
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def _run_code_async(
+    project_path: Path, *, imports: List[str], code: str, timeout: int, cache: bool
+) -> RunResult:
+    """
+    Coroutine behind `run_code`; `project_path` must already be resolved.
+
+    Lean runs via asyncio subprocess pipes, so several snippets can share one event
+    loop while their output is drained concurrently.
+    """
     tmp_dir = project_path / ".leanpy"
     tmp_dir.mkdir(parents=True, exist_ok=True)
 
     file_path = _run_file_path(tmp_dir, imports, code)
+    result_path = file_path.with_suffix(".result.json")
+    if cache:
+        cached = _load_cached_result(project_path, file_path, result_path)
+        if cached is not None:
+            return cached
     _write_run_file(file_path, imports, code)
 
     try:
-        proc = subprocess.run(
-            ["lake", "env", "lean", str(file_path)],
-            cwd=project_path,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
+        proc = await _run_async(
+            ["lake", "env", "lean", str(file_path)], cwd=project_path, timeout=timeout, text=False
         )
     except subprocess.TimeoutExpired as exc:
         raise ExecutionError(f"Lean execution timed out after {timeout}s") from exc
 
+    result = RunResult(
+        file=str(file_path),
+        stdout_bytes=proc.stdout,
+        stderr_bytes=proc.stderr,
+        returncode=proc.returncode,
+    )
     if proc.returncode != 0:
         raise ExecutionError(
-            f"Lean exited with {proc.returncode}.\nstdout:\n{proc.stdout}\n\nstderr:\n{proc.stderr}"
+            f"Lean exited with {proc.returncode}.\n"
+            f"stdout:\n{result.stdout}\n\nstderr:\n{result.stderr}"
         )
+    if cache:
+        _store_cached_result(project_path, file_path, result_path, result)
+    return result
 
-    return RunResult(
-        file=str(file_path),
-        stdout=proc.stdout,
-        stderr=proc.stderr,
-        returncode=proc.returncode,
-    )
+
+def _cache_key(project_path: Path, file_path: Path) -> dict[str, int | None]:
+    """Return the mtimes a cached result depends on (None for missing files)."""
+    key: dict[str, int | None] = {}
+    for path in (file_path, *(project_path / name for name in _PROJECT_CONFIG_FILES)):
+        try:
+            key[path.name] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            key[path.name] = None
+    return key
+
+
+def _load_cached_result(project_path: Path, file_path: Path, result_path: Path) -> RunResult | None:
+    """Return the stored result for `file_path` if it is still valid, else None."""
+    try:
+        data = json.loads(result_path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("key") != _cache_key(project_path, file_path):
+        return None
+    try:
+        return RunResult(
+            file=str(file_path),
+            stdout_bytes=base64.b64decode(data["stdout_b64"]),
+            stderr_bytes=base64.b64decode(data["stderr_b64"]),
+            returncode=data["returncode"],
+        )
+    except (KeyError, TypeError, ValueError):
+        # Written by an older version or damaged; treat as a miss.
+        return None
+
+
+def _store_cached_result(
+    project_path: Path, file_path: Path, result_path: Path, result: RunResult
+) -> None:
+    """Store `result` next to the run file (best-effort, atomic replace)."""
+    data = {
+        "key": _cache_key(project_path, file_path),
+        # Raw output bytes, base64-encoded, so a cache hit returns exactly what Lean wrote.
+        "stdout_b64": base64.b64encode(result.stdout_bytes).decode("ascii"),
+        "stderr_b64": base64.b64encode(result.stderr_bytes).decode("ascii"),
+        "returncode": result.returncode,
+    }
+    tmp = result_path.with_name(f"{result_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, result_path)
+    except OSError:
+        pass
 
 
 def _run_file_path(tmp_dir: Path, imports: List[str], code: str) -> Path:
@@ -66,20 +238,50 @@ def _run_file_path(tmp_dir: Path, imports: List[str], code: str) -> Path:
 
 
 def _write_run_file(file_path: Path, imports: List[str], code: str) -> None:
-    """Write the temp Lean file with imports followed by code."""
-    with file_path.open("w", encoding="utf-8") as f:
-        for imp in imports:
-            f.write(f"import {imp}\n")
-        f.write("\n")
-        f.write(code.strip())
-        f.write("\n")
+    """
+    Write the temp Lean file with imports followed by code, unless it already exists.
+
+    The file name is a digest of this content, so an existing file already holds it;
+    leaving it alone also keeps its mtime stable. The content is written in one go to
+    a uniquely named temp file and then hard-linked into place, so the
+    content-addressed name only ever shows complete content, even to a concurrent
+    run of the same snippet or after the writer was killed half-way.
+    """
+    if file_path.exists():
+        return
+    header = "".join(f"import {imp}\n" for imp in imports)
+    data = memoryview(f"{header}\n{code.strip()}\n".encode("utf-8"))
+    tmp = file_path.with_name(f".{file_path.name}.{os.getpid()}.{os.urandom(4).hex()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    try:
+        try:
+            while data:
+                data = data[os.write(fd, data) :]
+        finally:
+            os.close(fd)
+        try:
+            os.link(tmp, file_path)
+        except FileExistsError:
+            pass  # Another run linked the same content first.
+        except OSError:
+            # No hard links on this filesystem; an atomic replace is the next best.
+            os.replace(tmp, file_path)
+    finally:
+        tmp.unlink(missing_ok=True)
 
 
 def _content_digest(imports: List[str], code: str) -> str:
-    """Return a short hash of the imports+code content."""
-    return (
-        hashlib.sha1(
-            ("\n".join(imports) + "\n" + code).encode("utf-8"), usedforsecurity=False
-        ).hexdigest()[:12]
-    )
+    """
+    Return a short hash of the run file content (imports followed by code).
+
+    Uses BLAKE3 when the `blake3` package is installed, else SHA-256 (hardware
+    accelerated on most CPUs). Content is fed incrementally, without joining.
+    """
+    hasher = blake3.blake3() if blake3 is not None else hashlib.sha256()
+    for imp in imports:
+        hasher.update(f"import {imp}\n".encode("utf-8"))
+    hasher.update(b"\n")
+    hasher.update(code.strip().encode("utf-8"))
+    hasher.update(b"\n")
+    return hasher.hexdigest()[:12]
 
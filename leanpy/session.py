@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Any, List, Optional
+
+from .errors import ExecutionError
+from .runner import RunResult, _content_digest, _run_code_resolved
+
+# LSP DiagnosticSeverity -> label used by the `lean` command line.
+_SEVERITIES = {1: "error", 2: "warning", 3: "info", 4: "hint"}
+
+
+class LeanSession:
+    """
+    Check Lean snippets through one long-lived `lake serve` (the Lean language server).
+
+    `run_code` starts `lake env lean` for every snippet, reloading all imports each
+    time. A session keeps the server running with one open document per distinct
+    import list (at most `max_documents`, least recently used closed first), so a
+    later snippet with the same imports is re-elaborated without reloading them.
+
+    Results mirror `run_code`: messages are rendered the way `lean` prints them and
+    errors raise ExecutionError. If `lake serve` cannot be started, that `run` falls
+    back to `run_code` and the next one tries the server again. Use as a context
+    manager or call `close()`. Runs are serialized.
+    """
+
+    def __init__(self, project_path: os.PathLike | str, *, max_documents: int = 4):
+        self.path = Path(project_path).expanduser().resolve()
+        self.max_documents = max_documents
+        self._proc: Optional[subprocess.Popen[bytes]] = None
+        self._messages: queue.Queue[Optional[dict[str, Any]]] = queue.Queue()
+        self._ids = itertools.count(1)
+        # Import list -> [document path, version], least recently used first.
+        self._documents: OrderedDict[tuple[str, ...], list[Any]] = OrderedDict()
+        # Document URI -> (document version, diagnostics) of the latest publish.
+        self._diagnostics: dict[str, tuple[Optional[int], list[dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "LeanSession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def run(self, *, imports: List[str], code: str, timeout: int = 30) -> RunResult:
+        """
+        Check `code` after `imports` on the server and return its messages.
+
+        Raises ExecutionError if Lean reports an error or does not finish within
+        `timeout` seconds (the server is then restarted by the next run).
+        """
+        with self._lock:
+            if self._proc is None:
+                try:
+                    self._start(time.monotonic() + timeout)
+                except (OSError, TimeoutError, ExecutionError):
+                    # E.g. no `lake serve`, or imports too slow to load this time.
+                    self._stop()
+            if self._proc is None:
+                return _run_code_resolved(
+                    self.path, imports=imports, code=code, timeout=timeout, cache=False
+                )
+            return self._check(imports, code, timeout)
+
+    def close(self) -> None:
+        """Shut the server down (best-effort); a later `run` starts a new one."""
+        with self._lock:
+            if self._proc is None:
+                return
+            try:
+                self._request("shutdown", None, time.monotonic() + 5)
+                self._notify("exit", None)
+                self._proc.wait(timeout=5)
+            except (OSError, TimeoutError, ExecutionError, subprocess.TimeoutExpired):
+                pass
+            self._stop()
+
+    # --- internal helpers ---
+    def _start(self, deadline: float) -> None:
+        """Start `lake serve` and complete the LSP initialize handshake."""
+        self._proc = subprocess.Popen(
+            ["lake", "serve"],
+            cwd=self.path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        # A fresh queue per process, so a previous reader's end marker cannot leak in.
+        self._messages = queue.Queue()
+        threading.Thread(
+            target=_read_messages, args=(self._proc.stdout, self._messages), daemon=True
+        ).start()
+        params = {"processId": os.getpid(), "rootUri": self.path.as_uri(), "capabilities": {}}
+        self._request("initialize", params, deadline)
+        self._notify("initialized", {})
+
+    def _stop(self) -> None:
+        """Kill the server if it is running and forget its documents."""
+        if self._proc is not None:
+            if self._proc.poll() is None:
+                self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+        self._documents.clear()
+        self._diagnostics.clear()
+
+    def _check(self, imports: List[str], code: str, timeout: int) -> RunResult:
+        """Open or update the document for `imports` and collect its diagnostics."""
+        deadline = time.monotonic() + timeout
+        header = "".join(f"import {imp}\n" for imp in imports)
+        text = f"{header}\n{code.strip()}\n"
+        key = tuple(imports)
+        try:
+            document = self._documents.get(key)
+            if document is None:
+                file_path = self.path / ".leanpy" / f"session_{_content_digest(imports, '')}.lean"
+                document = self._documents[key] = [file_path, 1]
+                self._diagnostics.pop(file_path.as_uri(), None)
+                self._notify(
+                    "textDocument/didOpen",
+                    {
+                        "textDocument": {
+                            "uri": file_path.as_uri(),
+                            "languageId": "lean",
+                            "version": 1,
+                            "text": text,
+                        }
+                    },
+                )
+                self._close_stale_documents()
+            else:
+                self._documents.move_to_end(key)
+                document[1] += 1
+                self._diagnostics.pop(document[0].as_uri(), None)
+                self._notify(
+                    "textDocument/didChange",
+                    {
+                        "textDocument": {"uri": document[0].as_uri(), "version": document[1]},
+                        "contentChanges": [{"text": text}],
+                    },
+                )
+            file_path, version = document
+            uri = file_path.as_uri()
+            # Lean answers once the version is fully elaborated; its diagnostics come first.
+            self._request(
+                "textDocument/waitForDiagnostics", {"uri": uri, "version": version}, deadline
+            )
+        except TimeoutError as exc:
+            self._stop()
+            raise ExecutionError(f"Lean execution timed out after {timeout}s") from exc
+        except OSError as exc:
+            self._stop()
+            raise ExecutionError(f"Lost connection to lake serve: {exc}") from exc
+        except ExecutionError:
+            self._stop()
+            raise
+
+        # Keep the snippet on disk next to the run files, as `run_code` does.
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(text, encoding="utf-8")
+        published_version, diagnostics = self._diagnostics.get(uri, (None, []))
+        if published_version not in (None, version):
+            diagnostics = []
+        stdout, failed = _render_diagnostics(str(file_path), diagnostics)
+        if failed:
+            raise ExecutionError(f"Lean reported errors.\nstdout:\n{stdout}")
+        return RunResult(
+            file=str(file_path), stdout_bytes=stdout.encode("utf-8"), stderr_bytes=b"", returncode=0
+        )
+
+    def _close_stale_documents(self) -> None:
+        """Close the least recently used documents beyond `max_documents`."""
+        while len(self._documents) > self.max_documents:
+            _, (file_path, _) = self._documents.popitem(last=False)
+            uri = file_path.as_uri()
+            self._diagnostics.pop(uri, None)
+            self._notify("textDocument/didClose", {"textDocument": {"uri": uri}})
+
+    def _request(self, method: str, params: Any, deadline: float) -> Any:
+        """Send a request and handle incoming messages until its response arrives."""
+        request_id = next(self._ids)
+        self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        while True:
+            message = self._next_message(deadline)
+            if message.get("id") == request_id and "method" not in message:
+                if "error" in message:
+                    raise ExecutionError(f"lake serve rejected {method}: {message['error']}")
+                return message.get("result")
+            self._handle(message)
+
+    def _notify(self, method: str, params: Any) -> None:
+        self._send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def _send(self, message: dict[str, Any]) -> None:
+        """Write one message with LSP `Content-Length` framing."""
+        assert self._proc is not None and self._proc.stdin is not None
+        body = json.dumps(message).encode("utf-8")
+        self._proc.stdin.write(b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+        self._proc.stdin.flush()
+
+    def _next_message(self, deadline: float) -> dict[str, Any]:
+        """Return the next server message; raise TimeoutError once `deadline` passes."""
+        try:
+            message = self._messages.get(timeout=max(deadline - time.monotonic(), 0))
+        except queue.Empty:
+            raise TimeoutError from None
+        if message is None:
+            raise ExecutionError("lake serve exited unexpectedly.")
+        return message
+
+    def _handle(self, message: dict[str, Any]) -> None:
+        """Record diagnostics and acknowledge server-to-client requests."""
+        method = message.get("method")
+        if method == "textDocument/publishDiagnostics":
+            params = message["params"]
+            diagnostics = params.get("diagnostics", [])
+            self._diagnostics[params["uri"]] = (params.get("version"), diagnostics)
+        elif method is not None and "id" in message:
+            self._send({"jsonrpc": "2.0", "id": message["id"], "result": None})
+
+
+def _read_messages(stream: IO[bytes], messages: queue.Queue[Optional[dict[str, Any]]]) -> None:
+    """Parse `Content-Length` framed messages from `stream` into `messages`; None marks the end."""
+    try:
+        while True:
+            length = None
+            while True:
+                line = stream.readline()
+                if not line:
+                    return
+                line = line.strip()
+                if not line:
+                    break
+                name, _, value = line.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    length = int(value)
+            if length is None:
+                return
+            messages.put(json.loads(stream.read(length)))
+    except (OSError, ValueError):
+        pass
+    finally:
+        messages.put(None)
+
+
+def _render_diagnostics(file: str, diagnostics: list[dict[str, Any]]) -> tuple[str, bool]:
+    """
+    Render diagnostics like `lean <file>` prints messages; also return whether any is an error.
+
+    Information messages (e.g. `#eval` output) are printed as-is, others as
+    `<file>:<line>:<column>: <severity>: <message>`.
+    """
+    lines = []
+    failed = False
+    for diagnostic in sorted(
+        diagnostics,
+        key=lambda d: (d["range"]["start"]["line"], d["range"]["start"]["character"]),
+    ):
+        severity = diagnostic.get("severity", 1)
+        failed = failed or severity == 1
+        message = diagnostic.get("message", "")
+        if severity != 3:
+            start = diagnostic["range"]["start"]
+            label = _SEVERITIES.get(severity, "error")
+            message = f"{file}:{start['line'] + 1}:{start['character']}: {label}: {message}"
+        lines.append(message if message.endswith("\n") else f"{message}\n")
+    return "".join(lines), failed
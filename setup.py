@@ -15,6 +15,7 @@ setup(
     author="leanpy maintainers",
     packages=find_packages(exclude=("tests", "tests.*")),
     python_requires=">=3.11",
+    extras_require={"speedups": ["orjson", "blake3"]},
     include_package_data=True,
     classifiers=[
         "Programming Language :: Python :: 3",
@@ -1,6 +1,18 @@
+import os
+import tomllib
+
 import pytest
 
-from leanpy.deps import LeanDependencyConfig, install_dependency
+from leanpy import deps as deps_module
+
+from leanpy.deps import (
+    LeanDependencyConfig,
+    _declared_dependencies,
+    _fast_contains_dep,
+    _scope_name_from_git,
+    _write_dependencies_toml,
+    install_dependency,
+)
 from leanpy.errors import DependencyError, ProjectInitError
 from leanpy import LeanProject
 
@@ -12,6 +24,125 @@ def test_dependency_identifier_format():
     assert dep2.identifier == "org/pkg@1.2.3"
 
 
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://github.com/leanprover-community/mathlib4.git", ("leanprover-community", "mathlib4")),
+        ("https://github.com/org/repo/", ("org", "repo")),
+        ("git@github.com:org/repo.git", ("org", "repo")),
+        ("https://gitlab.com/group/sub/repo.git", ("sub", "repo")),
+        ("ssh://git@host:2222/org/repo.git", ("org", "repo")),
+        ("https://github.com/repo", ("unknown", "fallback")),
+        ("", ("unknown", "fallback")),
+    ],
+)
+def test_scope_name_from_git(url, expected):
+    """Ensure scope/repo come from the last two path segments of https and scp-style URLs."""
+    assert _scope_name_from_git(url, "fallback") == expected
+
+
+LAKEFILE_TOML = """name = "demo"
+defaultTargets = ["Demo"]
+
+[[require]]
+name = "mathlib"
+scope = "leanprover-community"
+rev = "v4.9.0"  # pinned
+
+[dependencies.aesop]
+git = "https://github.com/leanprover-community/aesop"
+
+[[lean_lib]]
+name = "Demo"
+"""
+
+
+def test_fast_contains_dep_matches_tomllib_semantics():
+    """
+    GIVEN a lakefile.toml with [[require]] and [dependencies.*] entries,
+    WHEN scanned without a TOML parse,
+    THEN presence follows the same scope/name/version rules as the parser-based check.
+    """
+    declared = _declared_dependencies(tomllib.loads(LAKEFILE_TOML))
+    assert LeanDependencyConfig(scope="leanprover-community", name="aesop") in declared
+
+    mathlib = LeanDependencyConfig(scope="leanprover-community", name="mathlib")
+    assert _fast_contains_dep(LAKEFILE_TOML, mathlib) is True
+    pinned = LeanDependencyConfig(scope="leanprover-community", name="mathlib", version="v4.9.0")
+    assert _fast_contains_dep(LAKEFILE_TOML, pinned) is True
+    other_rev = LeanDependencyConfig(scope="leanprover-community", name="mathlib", version="v4.8.0")
+    assert _fast_contains_dep(LAKEFILE_TOML, other_rev) is False
+    aesop = LeanDependencyConfig(scope="leanprover-community", name="aesop")
+    assert _fast_contains_dep(LAKEFILE_TOML, aesop) is True
+    assert _fast_contains_dep(LAKEFILE_TOML, LeanDependencyConfig(scope="org", name="Demo")) is False
+
+
+def test_fast_contains_dep_defers_on_unusual_layout():
+    """
+    GIVEN dependencies declared with inline tables or multi-line strings,
+    WHEN scanned,
+    THEN the scan reports None so the caller falls back to tomllib.
+    """
+    dep = LeanDependencyConfig(scope="org", name="pkg")
+    assert _fast_contains_dep('require = [{ name = "pkg", scope = "org" }]\n', dep) is None
+    assert _fast_contains_dep('[dependencies]\npkg = { scope = "org" }\n', dep) is None
+    assert _fast_contains_dep('[[require]]\nname = """pkg"""\n', dep) is None
+
+
+def test_install_dependency_rejects_malformed_lakefile_that_declares_it(tmp_path, monkeypatch):
+    """
+    GIVEN a lakefile.toml declaring the dependency but repeating a key or a table header,
+    WHEN the dependency is installed,
+    THEN the scan defers to tomllib and DependencyError is raised instead of returning silently.
+    """
+    monkeypatch.setattr(deps_module, "_run", lambda args, **kwargs: None)
+    dep = LeanDependencyConfig(scope="leanprover-community", name="mathlib")
+    lakefile = tmp_path / "lakefile.toml"
+    for text in (
+        'name = "again"\n' + LAKEFILE_TOML,
+        LAKEFILE_TOML + '\n[dependencies.aesop]\nscope = "leanprover-community"\n',
+    ):
+        assert _fast_contains_dep(text, dep) is None
+        lakefile.write_text(text, encoding="utf-8")
+        with pytest.raises(DependencyError):
+            install_dependency(tmp_path, dep)
+
+
+def test_write_dependencies_toml_appends_once(tmp_path):
+    """
+    GIVEN several dependencies, one already declared and others repeated with other options,
+    WHEN written to lakefile.toml,
+    THEN each missing package and version is appended exactly once.
+    """
+    lakefile = tmp_path / "lakefile.toml"
+    lakefile.write_text(LAKEFILE_TOML, encoding="utf-8")
+    batteries = LeanDependencyConfig(scope="leanprover-community", name="batteries")
+    cached = LeanDependencyConfig(scope="leanprover-community", name="batteries", cache=True)
+    qq = LeanDependencyConfig(scope="leanprover-community", name="qq", version="v4.9.0")
+    qq_any = LeanDependencyConfig(scope="leanprover-community", name="qq")
+    mathlib = LeanDependencyConfig(scope="leanprover-community", name="mathlib")
+    _write_dependencies_toml(lakefile, [mathlib, batteries, batteries, cached, qq, qq_any])
+
+    text = lakefile.read_text(encoding="utf-8")
+    assert text.startswith(LAKEFILE_TOML)
+    assert text.count("[[require]]") == 3
+    assert text.count('name = "batteries"') == 1
+    assert text.count('name = "qq"') == 1
+
+
+def test_write_dependencies_toml_rejects_invalid_toml(tmp_path):
+    """
+    GIVEN a malformed lakefile.toml,
+    WHEN a new dependency is written,
+    THEN DependencyError is raised and the file is left untouched.
+    """
+    lakefile = tmp_path / "lakefile.toml"
+    lakefile.write_text("name = \n", encoding="utf-8")
+    with pytest.raises(DependencyError):
+        _write_dependencies_toml(lakefile, [LeanDependencyConfig(scope="org", name="pkg")])
+    assert lakefile.read_text(encoding="utf-8") == "name = \n"
+
+
 def test_install_dependency_real(tmp_path):
     """
     Integration test: install a dependency in a real Lake project.
@@ -37,8 +168,32 @@ def test_install_dependency_real(tmp_path):
 
         # Rehydrate project from disk and confirm dependencies list is populated.
         new_project = LeanProject(project.path)
-        assert any(d.name == "mathlib" for d in new_project.dependencies)
+        assert any(d.name == "mathlib" for d in new_project.dependencies.values())
         new_project.remove()
     finally:
         project.remove()
 
+
+def test_install_dependency_skips_update_when_already_declared(tmp_path, monkeypatch):
+    """
+    GIVEN a dependency already in lakefile.toml and an up-to-date lake-manifest.json,
+    WHEN it is installed again,
+    THEN no lake command runs until lakefile.toml becomes newer than the manifest.
+    """
+    commands = []
+    monkeypatch.setattr(deps_module, "_run", lambda args, **kwargs: commands.append(args))
+    lakefile = tmp_path / "lakefile.toml"
+    lakefile.write_text(LAKEFILE_TOML, encoding="utf-8")
+    manifest = tmp_path / "lake-manifest.json"
+    manifest.write_text('{"packages": []}', encoding="utf-8")
+    os.utime(lakefile, ns=(1_000_000_000, 1_000_000_000))
+    os.utime(manifest, ns=(2_000_000_000, 2_000_000_000))
+
+    dep = LeanDependencyConfig(scope="leanprover-community", name="mathlib")
+    install_dependency(tmp_path, dep)
+    assert commands == []
+
+    os.utime(lakefile, ns=(3_000_000_000, 3_000_000_000))
+    install_dependency(tmp_path, dep)
+    assert commands == [["lake", "update", "--reconfigure"]]
+    assert lakefile.read_text(encoding="utf-8") == LAKEFILE_TOML
@@ -0,0 +1,131 @@
+import subprocess
+
+import pytest
+
+from leanpy import env
+from leanpy.errors import LeanNotFound, LeanPyError
+
+
+@pytest.fixture(autouse=True)
+def fresh_env_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    env.invalidate_cache()
+    yield
+    env.invalidate_cache()
+
+
+def test_binary_lookup_is_memoized(monkeypatch):
+    """
+    GIVEN lean on PATH,
+    WHEN ensure_lean_installed is called repeatedly,
+    THEN PATH is searched once until invalidate_cache is called.
+    """
+    calls = []
+
+    def fake_which(name):
+        calls.append(name)
+        return f"/opt/lean/bin/{name}"
+
+    monkeypatch.setattr(env.shutil, "which", fake_which)
+    assert env.ensure_lean_installed() == "/opt/lean/bin/lean"
+    assert env.ensure_lean_installed() == "/opt/lean/bin/lean"
+    assert calls == ["lean"]
+
+    env.invalidate_cache()
+    env.ensure_lean_installed()
+    assert calls == ["lean", "lean"]
+
+
+def test_missing_binary_is_not_memoized(monkeypatch):
+    """
+    GIVEN lean missing from PATH,
+    WHEN it is installed after the first failed lookup,
+    THEN the next lookup finds it instead of replaying the failure.
+    """
+    monkeypatch.setattr(env.shutil, "which", lambda name: None)
+    with pytest.raises(LeanNotFound):
+        env.ensure_lean_installed()
+
+    monkeypatch.setattr(env.shutil, "which", lambda name: f"/opt/lean/bin/{name}")
+    assert env.ensure_lean_installed() == "/opt/lean/bin/lean"
+
+
+def test_binary_lookup_persists_across_processes(tmp_path, monkeypatch):
+    """
+    GIVEN lean found once and recorded in the on-disk cache,
+    WHEN the in-process memoization is dropped (as in a fresh process),
+    THEN the cached path is reused without searching PATH, until PATH changes.
+    """
+    lean = tmp_path / "bin" / "lean"
+    lean.parent.mkdir()
+    lean.write_text("", encoding="utf-8")
+    monkeypatch.setattr(env.shutil, "which", lambda name: str(lean))
+    assert env.ensure_lean_installed() == str(lean)
+
+    env.ensure_lean_installed.cache_clear()
+    monkeypatch.setattr(env.shutil, "which", lambda name: None)
+    assert env.ensure_lean_installed() == str(lean)
+
+    env.ensure_lean_installed.cache_clear()
+    monkeypatch.setenv("PATH", "/somewhere/else")
+    with pytest.raises(LeanNotFound):
+        env.ensure_lean_installed()
+
+
+def test_failed_version_probe_is_not_cached(monkeypatch):
+    """
+    GIVEN lean and lake on PATH whose version probe fails (e.g. a toolchain download error),
+    WHEN versions() is called,
+    THEN LeanPyError is raised and the failure is neither memoized nor written to disk.
+    """
+    results = {
+        "lean": [(1, "", "error: toolchain download failed\n"), (0, "Lean (version 4.9.0)\n", "")],
+        "lake": [(0, "Lake version 5.0.0\n", ""), (0, "Lake version 5.0.0\n", "")],
+    }
+
+    async def fake_run(args, **kwargs):
+        return subprocess.CompletedProcess(args, *results[args[0]].pop(0))
+
+    monkeypatch.setattr(env.shutil, "which", lambda name: f"/opt/lean/bin/{name}")
+    monkeypatch.setattr(env, "_run_async", fake_run)
+    with pytest.raises(LeanPyError):
+        env.versions()
+    assert "lean_version" not in (env.load_env() or {})
+
+    assert env.versions() == {"lean": "Lean (version 4.9.0)", "lake": "Lake version 5.0.0"}
+
+
+def test_version_probe_timeout_raises_leanpy_error(monkeypatch):
+    """
+    GIVEN a version probe that outlives its timeout,
+    WHEN versions() is called,
+    THEN LeanPyError is raised instead of subprocess.TimeoutExpired.
+    """
+
+    async def slow_run(args, **kwargs):
+        raise subprocess.TimeoutExpired(args, 10)
+
+    monkeypatch.setattr(env.shutil, "which", lambda name: f"/opt/lean/bin/{name}")
+    monkeypatch.setattr(env, "_run_async", slow_run)
+    with pytest.raises(LeanPyError):
+        env.versions()
+
+
+def test_versions_are_not_persisted_across_processes(monkeypatch):
+    """
+    GIVEN versions probed once (with elan, lean/lake shims pick the toolchain per project),
+    WHEN the in-process memoization is dropped (as in a fresh process),
+    THEN the versions are probed again rather than read from the on-disk cache.
+    """
+    calls = []
+
+    async def fake_run(args, **kwargs):
+        calls.append(args)
+        return subprocess.CompletedProcess(args, 0, f"{args[0]} 1.0\n", "")
+
+    monkeypatch.setattr(env.shutil, "which", lambda name: f"/opt/lean/bin/{name}")
+    monkeypatch.setattr(env, "_run_async", fake_run)
+    env.versions()
+    env._probe_versions_once.cache_clear()
+    env.versions()
+    assert len(calls) == 4
@@ -1,6 +1,12 @@
+import copy
+import os
+import pickle
+import shutil
+
 import pytest
 
 from leanpy import LeanProject
+from leanpy import project as project_module
 from leanpy.errors import ProjectInitError
 
 
@@ -59,3 +65,121 @@ def test_clone_project(tmp_path):
         project.remove()
         cloned.remove()
 
+
+def test_clone_keeps_build_cache_but_not_run_scratch(tmp_path):
+    """
+    GIVEN a project with a `.lake` build cache and a `.leanpy` run directory,
+    WHEN clone is called,
+    THEN the build cache is copied byte-for-byte and the run scratch directory is not.
+    """
+    project = LeanProject(tmp_path / "proj_src")
+    cloned = None
+    try:
+        (project.path / ".lake" / "build").mkdir(parents=True, exist_ok=True)
+        (project.path / ".lake" / "build" / "Demo.olean").write_bytes(b"\x00olean")
+        (project.path / ".leanpy").mkdir(exist_ok=True)
+        (project.path / ".leanpy" / "run_0.lean").write_text("#eval 1", encoding="utf-8")
+
+        cloned = project.clone(tmp_path / "proj_dst")
+        assert (cloned.path / ".lake" / "build" / "Demo.olean").read_bytes() == b"\x00olean"
+        assert not (cloned.path / ".leanpy").exists()
+    finally:
+        project.remove()
+        if cloned is not None:
+            cloned.remove()
+
+
+def test_remove_frees_path_immediately(tmp_path):
+    """
+    GIVEN an existing Lake project,
+    WHEN remove is called,
+    THEN the project path is gone right away and its contents are deleted in the background.
+    """
+    project = LeanProject(tmp_path / "proj")
+    project.remove()
+    assert not project.path.exists()
+    project._remove_thread.join(timeout=10)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_construction_reuses_live_instance(tmp_path):
+    """
+    GIVEN a live LeanProject,
+    WHEN it is constructed again for the same path,
+    THEN the same instance is returned, unless a different name is requested or it was removed.
+    """
+    project = LeanProject(tmp_path / "proj")
+    assert LeanProject(project.path) is project
+    assert LeanProject(project.path, name="other").name == "other"
+
+    again = LeanProject(tmp_path / "proj")
+    again.remove()
+    fresh = LeanProject(tmp_path / "proj")
+    assert fresh is not again
+    fresh.remove()
+
+
+def test_symlinked_path_maps_to_the_real_project(tmp_path):
+    """
+    GIVEN a Lake project and a symlink pointing at it,
+    WHEN LeanProject is constructed through the symlink and removed,
+    THEN it is the same instance as for the real path and the real directory is deleted.
+    """
+    project = LeanProject(tmp_path / "real")
+    link = tmp_path / "link"
+    link.symlink_to(project.path, target_is_directory=True)
+    try:
+        via_link = LeanProject(link)
+        assert via_link is project
+        assert via_link.path == (tmp_path / "real").resolve()
+    finally:
+        project.remove()
+    assert not (tmp_path / "real").exists()
+
+
+def test_reconstruction_keeps_raising_for_a_corrupted_lakefile(tmp_path):
+    """
+    GIVEN a live LeanProject whose lakefile.toml is then corrupted,
+    WHEN it is constructed again twice,
+    THEN both constructions raise ProjectInitError instead of reusing stale dependencies.
+    """
+    project = LeanProject(tmp_path / "proj")
+    try:
+        (project.path / "lakefile.toml").write_text('name = "proj"\nname = \n')
+        for _ in range(2):
+            with pytest.raises(ProjectInitError):
+                LeanProject(project.path)
+    finally:
+        project.remove()
+
+
+def test_project_survives_copy_and_pickle(tmp_path):
+    """
+    GIVEN a live LeanProject,
+    WHEN it is copied, deep-copied and pickled,
+    THEN each copy has the same path, name and dependencies.
+    """
+    project = LeanProject(tmp_path / "proj")
+    try:
+        for dup in (
+            copy.copy(project),
+            copy.deepcopy(project),
+            pickle.loads(pickle.dumps(project)),
+        ):
+            assert dup.path == project.path
+            assert dup.name == project.name
+            assert dup.dependencies == project.dependencies
+    finally:
+        project.remove()
+
+
+def test_clone_copy_hands_special_files_to_copy2(tmp_path):
+    """
+    GIVEN a named pipe,
+    WHEN it is copied with the clone copy function,
+    THEN it is not opened for cloning and copy2 rejects it instead of blocking.
+    """
+    fifo = tmp_path / "pipe"
+    os.mkfifo(fifo)
+    with pytest.raises(shutil.SpecialFileError):
+        project_module._reflink_copy(str(fifo), str(tmp_path / "copy"))
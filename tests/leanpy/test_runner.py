@@ -1,11 +1,11 @@
-import hashlib
 import subprocess
 
 import pytest
 
 from leanpy import LeanProject, LeanDependencyConfig
+from leanpy import runner
 from leanpy.errors import ExecutionError
-from leanpy.runner import RunResult
+from leanpy.runner import RunResult, _content_digest
 
 
 def test_run_code_success(tmp_path):
@@ -20,7 +20,7 @@ def test_run_code_success(tmp_path):
         code = "#eval 1 + 1"
         result = project.run(imports=imports, code=code, timeout=30)
 
-        digest = hashlib.sha1(("\n".join(imports) + "\n" + code).encode("utf-8"), usedforsecurity=False).hexdigest()[:12]
+        digest = _content_digest(imports, code)
         expected_file = project.path / ".leanpy" / f"run_{digest}.lean"
 
         assert isinstance(result, RunResult)
@@ -33,6 +33,60 @@ def test_run_code_success(tmp_path):
         project.remove()
 
 
+def test_run_code_reuses_cached_result(tmp_path, monkeypatch):
+    """
+    GIVEN a snippet that already ran successfully,
+    WHEN it is run again with caching enabled,
+    THEN the stored result is returned without invoking Lean; caching is opt-in.
+    """
+    project = LeanProject(tmp_path / "proj_cache")
+    try:
+        first = project.run(imports=[], code="#eval 1 + 1", timeout=30, cache=True)
+
+        async def fail_run(*args, **kwargs):
+            raise AssertionError("Lean should not be invoked on a cache hit")
+
+        monkeypatch.setattr(runner, "_run_async", fail_run)
+        assert project.run(imports=[], code="#eval 1 + 1", timeout=30, cache=True) == first
+        with pytest.raises(AssertionError):
+            project.run(imports=[], code="#eval 1 + 1", timeout=30)
+    finally:
+        project.remove()
+
+
+def test_run_many_returns_results_in_job_order(tmp_path):
+    """
+    GIVEN several snippets, one of them broken,
+    WHEN run_many executes them concurrently,
+    THEN successful batches return results in job order and a broken job raises.
+    """
+    project = LeanProject(tmp_path / "proj_many")
+    try:
+        results = project.run_many(
+            [([], "#eval 1 + 1"), ([], "#eval 40 + 2")], max_parallel=2, timeout=30
+        )
+        assert [r.returncode for r in results] == [0, 0]
+        assert results[0].file != results[1].file
+        assert "2" in results[0].stdout
+
+        with pytest.raises(ExecutionError):
+            project.run_many([([], "#eval 1"), ([], "def bad : Bool := nope")], timeout=30)
+    finally:
+        project.remove()
+
+
+def test_content_digest_tracks_file_content():
+    """
+    GIVEN snippets that render to the same or different run files,
+    WHEN hashed,
+    THEN digests are equal exactly when the written content would be.
+    """
+    assert len(_content_digest(["Mathlib"], "#eval 1")) == 12
+    assert _content_digest(["Mathlib"], "#eval 1") == _content_digest(["Mathlib"], "\n#eval 1\n")
+    assert _content_digest(["A"], "B") != _content_digest([], "A\nB")
+    assert _content_digest(["A", "B"], "C") != _content_digest(["B", "A"], "C")
+
+
 def test_run_code_failure(tmp_path):
     """
     GIVEN a real Lake project and broken Lean snippet,
@@ -77,3 +131,50 @@ def test_run_code_with_installed_dependency(tmp_path):
     finally:
         project.remove()
 
+
+def test_run_result_decodes_output_on_access():
+    """
+    GIVEN a RunResult holding raw output bytes, including an invalid UTF-8 byte,
+    WHEN stdout and stderr are read,
+    THEN they are decoded as UTF-8 with the invalid byte replaced.
+    """
+    result = RunResult(file="run.lean", stdout_bytes=b"2\n\xff", stderr_bytes=b"", returncode=0)
+    assert result.stdout == "2\n�"
+    assert result.stderr == ""
+    assert result.stdout_bytes == b"2\n\xff"
+
+
+def test_cached_result_round_trips_raw_bytes(tmp_path):
+    """
+    GIVEN a result whose output contains invalid UTF-8,
+    WHEN it is stored in and loaded from the result cache,
+    THEN the loaded output bytes are identical and nothing was decoded to store it.
+    """
+    file_path = tmp_path / "run_0.lean"
+    file_path.write_text("#eval 1", encoding="utf-8")
+    result_path = file_path.with_suffix(".result.json")
+    result = RunResult(
+        file=str(file_path), stdout_bytes=b"2\n\xff", stderr_bytes=b"\xfe", returncode=0
+    )
+    runner._store_cached_result(tmp_path, file_path, result_path, result)
+    assert "stdout" not in result.__dict__
+
+    loaded = runner._load_cached_result(tmp_path, file_path, result_path)
+    assert loaded.stdout_bytes == b"2\n\xff"
+    assert loaded.stderr_bytes == b"\xfe"
+
+
+def test_write_run_file_publishes_complete_content_once(tmp_path):
+    """
+    GIVEN a run file path that does not exist yet,
+    WHEN the run file is written twice,
+    THEN it holds the full content, keeps its first mtime, and no temp files are left.
+    """
+    file_path = tmp_path / "run_0.lean"
+    runner._write_run_file(file_path, ["Mathlib"], "#eval 1 + 1\n")
+    mtime = file_path.stat().st_mtime_ns
+    runner._write_run_file(file_path, ["Mathlib"], "#eval 1 + 1\n")
+
+    assert file_path.read_text(encoding="utf-8") == "import Mathlib\n\n#eval 1 + 1\n"
+    assert file_path.stat().st_mtime_ns == mtime
+    assert [p.name for p in tmp_path.iterdir()] == ["run_0.lean"]
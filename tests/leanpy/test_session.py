@@ -0,0 +1,91 @@
+import pytest
+
+from leanpy import LeanProject
+from leanpy import session as session_module
+from leanpy.errors import ExecutionError
+from leanpy.runner import RunResult
+
+
+def test_session_runs_snippets_on_one_server(tmp_path):
+    """
+    GIVEN a real Lake project and a session on it,
+    WHEN several snippets with the same imports are run,
+    THEN each returns Lean's messages, errors raise ExecutionError, and the server is reused.
+    """
+    project = LeanProject(tmp_path / "proj")
+    try:
+        with project.session() as session:
+            result = session.run(imports=[], code="#eval 1 + 1")
+            assert isinstance(result, RunResult)
+            assert result.returncode == 0
+            assert "2" in result.stdout
+            server = session._proc
+
+            with pytest.raises(ExecutionError):
+                session.run(imports=[], code="#eval sorry_error")
+
+            assert "5" in session.run(imports=[], code="#eval 2 + 3").stdout
+            assert session._proc is server
+        assert session._proc is None
+    finally:
+        project.remove()
+
+
+def test_session_falls_back_without_lake_serve(tmp_path, monkeypatch):
+    """
+    GIVEN a session whose `lake serve` cannot be started,
+    WHEN a snippet is run,
+    THEN it is executed through run_code instead.
+    """
+    calls = []
+
+    def fail_popen(*args, **kwargs):
+        raise FileNotFoundError("lake")
+
+    def fake_run_code(project_path, **kwargs):
+        calls.append(kwargs["code"])
+        return RunResult(file="run.lean", stdout_bytes=b"2\n", stderr_bytes=b"", returncode=0)
+
+    monkeypatch.setattr(session_module.subprocess, "Popen", fail_popen)
+    monkeypatch.setattr(session_module, "_run_code_resolved", fake_run_code)
+    with session_module.LeanSession(tmp_path) as session:
+        assert session.run(imports=[], code="#eval 1 + 1").stdout == "2\n"
+        assert session.run(imports=[], code="#eval 1 + 1").stdout == "2\n"
+    assert calls == ["#eval 1 + 1", "#eval 1 + 1"]
+
+
+def test_session_ignores_diagnostics_of_previous_versions(tmp_path, monkeypatch):
+    """
+    GIVEN a document whose first version published an error,
+    WHEN the next snippet's version is answered without publishing new diagnostics,
+    THEN the earlier error is not reported for the new snippet.
+    """
+    session = session_module.LeanSession(tmp_path)
+    published = [True, False]
+
+    def fake_send(message):
+        if message.get("method") != "textDocument/waitForDiagnostics":
+            return
+        params = message["params"]
+        if published.pop(0):
+            error = {
+                "range": {"start": {"line": 1, "character": 0}},
+                "severity": 1,
+                "message": "unknown identifier 'nope'",
+            }
+            session._messages.put(
+                {
+                    "method": "textDocument/publishDiagnostics",
+                    "params": {
+                        "uri": params["uri"],
+                        "version": params["version"],
+                        "diagnostics": [error],
+                    },
+                }
+            )
+        session._messages.put({"id": message["id"], "result": {}})
+
+    monkeypatch.setattr(session, "_send", fake_send)
+    with pytest.raises(ExecutionError):
+        session._check([], "#eval nope", timeout=5)
+    assert session._check([], "#eval 1", timeout=5).stdout == ""